@@ -1,30 +1,23 @@
 import os
+import selectors
 import subprocess
 import sys
 import threading
-import time
 
-from pydantic import SecretStr
+import httpx
+from _common import LOCAL_HTTP, get_llm, run_convo
 
-from openhands.sdk import LLM, Conversation, RemoteConversation, Workspace, get_logger
-from openhands.sdk.event import ConversationStateUpdateEvent
+from openhands.sdk import Workspace, get_logger
 from openhands.tools.preset.default import get_default_agent
 
 
 logger = get_logger(__name__)
 
+# Environment for the server subprocess; these override any inherited values
+_SERVER_ENV = {**os.environ, "LOG_JSON": "true", "PYTHONUNBUFFERED": "1"}
 
-def _stream_output(stream, prefix, target_stream):
-    """Stream output from subprocess to target stream with prefix."""
-    try:
-        for line in iter(stream.readline, ""):
-            if line:
-                target_stream.write(f"[{prefix}] {line}")
-                target_stream.flush()
-    except Exception as e:
-        print(f"Error streaming {prefix}: {e}", file=sys.stderr)
-    finally:
-        stream.close()
+# Logged by uvicorn once the server is accepting connections
+_READY_TOKEN = b"Uvicorn running on"
 
 
 class ManagedAPIServer:
@@ -35,17 +28,73 @@ class ManagedAPIServer:
         self.host = host
         self.process = None
         self.base_url = f"http://{host}:{port}"
-        self.stdout_thread = None
-        self.stderr_thread = None
+        self.output_thread = None
+        self._ready = threading.Event()
+
+    def _stream_output(self, streams):
+        """Forward subprocess output to target streams with a prefix.
+
+        `streams` is a sequence of `(stream, prefix, target_stream)` tuples. All
+        streams are multiplexed on one selector; whatever is available is read in
+        bulk and complete lines are written to the target in a single call.
+
+        Sets `self._ready` once the server logs that it is listening, or when
+        all streams are closed, so `__enter__` never waits on a dead server.
+        """
+        sel = selectors.DefaultSelector()
+        for stream, prefix, target_stream in streams:
+            os.set_blocking(stream.fileno(), False)
+            sel.register(
+                stream,
+                selectors.EVENT_READ,
+                (stream, prefix, target_stream, bytearray()),
+            )
+        try:
+            while sel.get_map():
+                for key, _ in sel.select():
+                    stream, prefix, target_stream, tail = key.data
+                    try:
+                        chunk = os.read(key.fd, 65536)
+                    except BlockingIOError:
+                        continue
+                    if chunk:
+                        tail += chunk
+                        end = tail.rfind(b"\n") + 1
+                    else:
+                        # EOF: flush any partial last line and stop watching
+                        sel.unregister(stream)
+                        stream.close()
+                        if tail and not tail.endswith(b"\n"):
+                            tail += b"\n"
+                        end = len(tail)
+                    if not end:
+                        continue
+                    data = bytes(tail[:end])
+                    del tail[:end]
+                    if not self._ready.is_set() and _READY_TOKEN in data:
+                        self._ready.set()
+                    lines = data.decode(errors="replace").splitlines(keepends=True)
+                    target_stream.write("".join(f"[{prefix}] {line}" for line in lines))
+                    target_stream.flush()
+        except Exception as e:
+            logger.error(f"Error streaming output: {e}")
+        finally:
+            for key in list(sel.get_map().values()):
+                key.data[0].close()
+            sel.close()
+            self._ready.set()
 
     def __enter__(self):
         """Start the API server subprocess."""
-        print(f"Starting OpenHands API server on {self.base_url}...")
+        logger.info(f"Starting OpenHands API server on {self.base_url}...")
 
         # Start the server process
         self.process = subprocess.Popen(
             [
-                "python",
+                # Same interpreter as this script; -u so server logs (and the
+                # readiness line) are not held back by block buffering
+                sys.executable,
+                "-u",
                 "-m",
                 "openhands.agent_server",
                 "--port",
@@ -55,104 +104,92 @@ class ManagedAPIServer:
             ],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
-            env={"LOG_JSON": "true", **os.environ},
+            # The pipes are drained with os.read(), so skip Python-side buffering
+            bufsize=0,
+            env=_SERVER_ENV,
         )
 
-        # Start threads to stream stdout and stderr
-        self.stdout_thread = threading.Thread(
-            target=_stream_output,
-            args=(self.process.stdout, "SERVER", sys.stdout),
-            daemon=True,
-        )
-        self.stderr_thread = threading.Thread(
-            target=_stream_output,
-            args=(self.process.stderr, "SERVER", sys.stderr),
-            daemon=True,
-        )
-
-        self.stdout_thread.start()
-        self.stderr_thread.start()
-
-        # Wait for server to be ready
-        max_retries = 30
-        for i in range(max_retries):
-            try:
-                import httpx
-
-                response = httpx.get(f"{self.base_url}/health", timeout=1.0)
-                if response.status_code == 200:
-                    print(f"API server is ready at {self.base_url}")
-                    return self
-            except Exception:
-                pass
-
-            if self.process.poll() is not None:
-                # Process has terminated
-                raise RuntimeError(
-                    "Server process terminated unexpectedly. "
-                    "Check the server logs above for details."
-                )
-
-            time.sleep(1)
-
-        raise RuntimeError(f"Server failed to start after {max_retries} seconds")
+        # __exit__ is not called when __enter__ raises, so stop the server on
+        # any failure (including KeyboardInterrupt) before propagating it
+        try:
+            # Forward stdout and stderr from a single thread
+            self.output_thread = threading.Thread(
+                target=self._stream_output,
+                args=(
+                    [
+                        (self.process.stdout, "SERVER", sys.stdout),
+                        (self.process.stderr, "SERVER", sys.stderr),
+                    ],
+                ),
+                daemon=True,
+            )
+            self.output_thread.start()
+            self._wait_until_ready()
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def _wait_until_ready(self) -> None:
+        """Wait for the server to accept requests, raising if it does not."""
+        assert self.process is not None
+
+        # Wait for the server to report it is listening, then confirm with a
+        # single health check. The check also runs if the readiness line never
+        # shows up (e.g. LOG_LEVEL filters it out), so such a server is still
+        # detected once the wait times out.
+        startup_timeout = 30
+        ready_seen = self._ready.wait(timeout=startup_timeout)
+        try:
+            response = LOCAL_HTTP.get(f"{self.base_url}/health", timeout=1.0)
+            if response.status_code == 200:
+                logger.info(f"API server is ready at {self.base_url}")
+                return
+        except (httpx.HTTPError, ConnectionRefusedError):
+            pass
+
+        # The forwarder also signals readiness when the server's output closes,
+        # which can happen just before the process can be reaped
+        try:
+            self.process.wait(timeout=1)
+            message = (
+                "Server process terminated unexpectedly. "
+                "Check the server logs above for details."
+            )
+        except subprocess.TimeoutExpired:
+            message = (
+                f"Server at {self.base_url} failed its health check"
+                if ready_seen
+                else f"Server failed to start after {startup_timeout} seconds"
+            )
+        raise RuntimeError(message)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Stop the API server subprocess."""
         if self.process:
-            print("Stopping API server...")
+            logger.info("Stopping API server...")
             self.process.terminate()
             try:
                 self.process.wait(timeout=5)
             except subprocess.TimeoutExpired:
-                print("Force killing API server...")
+                logger.warning("Force killing API server...")
                 self.process.kill()
                 self.process.wait()
 
-            # Wait for streaming threads to finish (they're daemon threads,
-            # so they'll stop automatically)
-            # But give them a moment to flush any remaining output
-            time.sleep(0.5)
-            print("API server stopped.")
-
-
-api_key = os.getenv("LLM_API_KEY")
-assert api_key is not None, "LLM_API_KEY environment variable is not set."
-
-llm = LLM(
-    service_id="agent",
-    model="litellm_proxy/anthropic/claude-sonnet-4-5-20250929",
-    base_url="https://llm-proxy.eval.all-hands.dev",
-    api_key=SecretStr(api_key),
-)
-title_gen_llm = LLM(
-    service_id="title-gen-llm",
-    model="litellm_proxy/openai/gpt-5-mini",
-    base_url="https://llm-proxy.eval.all-hands.dev",
-    api_key=SecretStr(api_key),
-)
+            # The forwarder exits once the server's pipes reach EOF; give it a
+            # short grace period to flush any remaining output
+            if self.output_thread is not None:
+                self.output_thread.join(timeout=0.5)
+            logger.info("API server stopped.")
+
 
 # Use managed API server
 with ManagedAPIServer(port=8001) as server:
-    # Create agent
     agent = get_default_agent(
-        llm=llm,
+        llm=get_llm(),
         cli_mode=True,  # Disable browser tools for simplicity
     )
 
-    # Define callbacks to test the WebSocket functionality
-    received_events = []
-    event_tracker = {"last_event_time": time.time()}
-
-    def event_callback(event):
-        """Callback to capture events for testing."""
-        event_type = type(event).__name__
-        logger.info(f"🔔 Callback received event: {event_type}\n{event}")
-        received_events.append(event)
-        event_tracker["last_event_time"] = time.time()
-
-    # Create RemoteConversation with callbacks
     # NOTE: Workspace is required for RemoteConversation
     workspace = Workspace(host=server.base_url)
     result = workspace.execute_command("pwd")
@@ -161,79 +198,4 @@ with ManagedAPIServer(port=8001) as server:
     )
     logger.info(f"Output: {result.stdout}")
 
-    conversation = Conversation(
-        agent=agent,
-        workspace=workspace,
-        callbacks=[event_callback],
-        visualize=True,
-    )
-    assert isinstance(conversation, RemoteConversation)
-
-    try:
-        logger.info(f"\n📋 Conversation ID: {conversation.state.id}")
-
-        # Send first message and run
-        logger.info("📝 Sending first message...")
-        conversation.send_message(
-            "Read the current repo and write 3 facts about the project into FACTS.txt."
-        )
-
-        # Generate title using a specific LLM
-        title = conversation.generate_title(max_length=60, llm=title_gen_llm)
-        logger.info(f"Generated conversation title: {title}")
-
-        logger.info("🚀 Running conversation...")
-        conversation.run()
-
-        logger.info("✅ First task completed!")
-        logger.info(f"Agent status: {conversation.state.agent_status}")
-
-        # Wait for events to stop coming (no events for 2 seconds)
-        logger.info("⏳ Waiting for events to stop...")
-        while time.time() - event_tracker["last_event_time"] < 2.0:
-            time.sleep(0.1)
-        logger.info("✅ Events have stopped")
-
-        logger.info("🚀 Running conversation again...")
-        conversation.send_message("Great! Now delete that file.")
-        conversation.run()
-        logger.info("✅ Second task completed!")
-
-        # Demonstrate state.events functionality
-        logger.info("\n" + "=" * 50)
-        logger.info("📊 Demonstrating State Events API")
-        logger.info("=" * 50)
-
-        # Count total events using state.events
-        total_events = len(conversation.state.events)
-        logger.info(f"📈 Total events in conversation: {total_events}")
-
-        # Get recent events (last 5) using state.events
-        logger.info("\n🔍 Getting last 5 events using state.events...")
-        all_events = conversation.state.events
-        recent_events = all_events[-5:] if len(all_events) >= 5 else all_events
-
-        for i, event in enumerate(recent_events, 1):
-            event_type = type(event).__name__
-            timestamp = getattr(event, "timestamp", "Unknown")
-            logger.info(f"  {i}. {event_type} at {timestamp}")
-
-        # Let's see what the actual event types are
-        logger.info("\n🔍 Event types found:")
-        event_types = set()
-        for event in recent_events:
-            event_type = type(event).__name__
-            event_types.add(event_type)
-        for event_type in sorted(event_types):
-            logger.info(f"  - {event_type}")
-
-        # Print all ConversationStateUpdateEvent
-        logger.info("\n🗂️  ConversationStateUpdateEvent events:")
-        for event in conversation.state.events:
-            if isinstance(event, ConversationStateUpdateEvent):
-                logger.info(f"  - {event}")
-
-    finally:
-        # Clean up
-        print("\n🧹 Cleaning up conversation...")
-        conversation.close()
+    run_convo(workspace, agent, generate_title=True, show_state_events=True)
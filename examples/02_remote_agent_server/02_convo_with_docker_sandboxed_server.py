@@ -1,15 +1,6 @@
-import os
-import platform
-import time
+from _common import detect_platform, get_llm, run_convo
 
-from pydantic import SecretStr
-
-from openhands.sdk import (
-    LLM,
-    Conversation,
-    RemoteConversation,
-    get_logger,
-)
+from openhands.sdk import get_logger
 from openhands.tools.preset.default import get_default_agent
 from openhands.workspace import DockerWorkspace
 
@@ -18,24 +9,7 @@ logger = get_logger(__name__)
 
 
 # 1) Ensure we have LLM API key
-api_key = os.getenv("LLM_API_KEY")
-assert api_key is not None, "LLM_API_KEY environment variable is not set."
-
-llm = LLM(
-    service_id="agent",
-    model="litellm_proxy/anthropic/claude-sonnet-4-5-20250929",
-    base_url="https://llm-proxy.eval.all-hands.dev",
-    api_key=SecretStr(api_key),
-)
-
-
-def detect_platform():
-    """Detects the correct Docker platform string."""
-    machine = platform.machine().lower()
-    if "arm" in machine or "aarch64" in machine:
-        return "linux/arm64"
-    return "linux/amd64"
-
+llm = get_llm()
 
 # 2) Create a Docker-based remote workspace that will set up and manage
 #    the Docker container automatically
@@ -54,17 +28,7 @@ with DockerWorkspace(
         cli_mode=True,
     )
 
-    # 4) Set up callback collection
-    received_events: list = []
-    last_event_time = {"ts": time.time()}
-
-    def event_callback(event) -> None:
-        event_type = type(event).__name__
-        logger.info(f"🔔 Callback received event: {event_type}\n{event}")
-        received_events.append(event)
-        last_event_time["ts"] = time.time()
-
-    # 5) Test the workspace with a simple command
+    # 4) Test the workspace with a simple command
     result = workspace.execute_command(
         "echo 'Hello from sandboxed environment!' && pwd"
     )
@@ -72,36 +36,6 @@ with DockerWorkspace(
         f"Command '{result.command}' completed with exit code {result.exit_code}"
     )
     logger.info(f"Output: {result.stdout}")
-    conversation = Conversation(
-        agent=agent,
-        workspace=workspace,
-        callbacks=[event_callback],
-        visualize=True,
-    )
-    assert isinstance(conversation, RemoteConversation)
-
-    try:
-        logger.info(f"\n📋 Conversation ID: {conversation.state.id}")
-
-        logger.info("📝 Sending first message...")
-        conversation.send_message(
-            "Read the current repo and write 3 facts about the project into FACTS.txt."
-        )
-        logger.info("🚀 Running conversation...")
-        conversation.run()
-        logger.info("✅ First task completed!")
-        logger.info(f"Agent status: {conversation.state.agent_status}")
-
-        # Wait for events to settle (no events for 2 seconds)
-        logger.info("⏳ Waiting for events to stop...")
-        while time.time() - last_event_time["ts"] < 2.0:
-            time.sleep(0.1)
-        logger.info("✅ Events have stopped")
 
-        logger.info("🚀 Running conversation again...")
-        conversation.send_message("Great! Now delete that file.")
-        conversation.run()
-        logger.info("✅ Second task completed!")
-    finally:
-        print("\n🧹 Cleaning up conversation...")
-        conversation.close()
+    # 5) Run the conversation
+    run_convo(workspace, agent)
@@ -12,16 +12,10 @@ Requirements:
 """
 
 import os
-import time
 
-from pydantic import SecretStr
+from _common import get_llm, run_convo
 
-from openhands.sdk import (
-    LLM,
-    Conversation,
-    RemoteConversation,
-    get_logger,
-)
+from openhands.sdk import get_logger
 from openhands.tools.preset.default import get_default_agent
 from openhands.workspace import APIRemoteWorkspace
 
@@ -29,15 +23,7 @@ from openhands.workspace import APIRemoteWorkspace
 logger = get_logger(__name__)
 
 
-api_key = os.getenv("LITELLM_API_KEY")
-assert api_key, "LITELLM_API_KEY required"
-
-llm = LLM(
-    service_id="agent",
-    model="litellm_proxy/anthropic/claude-sonnet-4-5-20250929",
-    base_url="https://llm-proxy.eval.all-hands.dev",
-    api_key=SecretStr(api_key),
-)
+llm = get_llm("LITELLM_API_KEY")
 
 runtime_api_key = os.getenv("RUNTIME_API_KEY")
 if not runtime_api_key:
@@ -51,33 +37,10 @@ with APIRemoteWorkspace(
     server_image="ghcr.io/all-hands-ai/agent-server:latest-python",
 ) as workspace:
     agent = get_default_agent(llm=llm, cli_mode=True)
-    received_events: list = []
-    last_event_time = {"ts": time.time()}
-
-    def event_callback(event) -> None:
-        received_events.append(event)
-        last_event_time["ts"] = time.time()
 
     result = workspace.execute_command(
         "echo 'Hello from sandboxed environment!' && pwd"
     )
     logger.info(f"Command completed: {result.exit_code}, {result.stdout}")
 
-    conversation = Conversation(
-        agent=agent, workspace=workspace, callbacks=[event_callback], visualize=True
-    )
-    assert isinstance(conversation, RemoteConversation)
-
-    try:
-        conversation.send_message(
-            "Read the current repo and write 3 facts about the project into FACTS.txt."
-        )
-        conversation.run()
-
-        while time.time() - last_event_time["ts"] < 2.0:
-            time.sleep(0.1)
-
-        conversation.send_message("Great! Now delete that file.")
-        conversation.run()
-    finally:
-        conversation.close()
+    run_convo(workspace, agent, log_events=False)
@@ -1,34 +1,17 @@
-import os
-import time
-
 import httpx
-from pydantic import SecretStr
+from _common import LOCAL_HTTP, detect_platform, get_llm, run_convo
 
-from openhands.sdk import LLM, Conversation, get_logger
-from openhands.sdk.conversation.impl.remote_conversation import RemoteConversation
 from openhands.tools.preset.default import get_default_agent
 from openhands.workspace import DockerWorkspace
 
 
-logger = get_logger(__name__)
-
-
-api_key = os.getenv("LLM_API_KEY")
-assert api_key is not None, "LLM_API_KEY environment variable is not set."
-
-llm = LLM(
-    service_id="agent",
-    model="litellm_proxy/anthropic/claude-sonnet-4-5-20250929",
-    base_url="https://llm-proxy.eval.all-hands.dev",
-    api_key=SecretStr(api_key),
-)
+llm = get_llm()
 
 # Create a Docker-based remote workspace with extra ports for VSCode access
 with DockerWorkspace(
     base_image="nikolaik/python-nodejs:python3.12-nodejs22",
     host_port=18010,
-    # TODO: Change this to your platform if not linux/arm64
-    platform="linux/arm64",
+    platform=detect_platform(),
     extra_ports=True,  # Expose extra ports for VSCode and VNC
     forward_env=["LLM_API_KEY"],  # Forward API key to container
 ) as workspace:
@@ -40,34 +23,17 @@ with DockerWorkspace(
         cli_mode=True,
     )
 
-    # Set up callback collection
-    received_events: list = []
-    last_event_time = {"ts": time.time()}
-
-    def event_callback(event) -> None:
-        event_type = type(event).__name__
-        logger.info(f"🔔 Callback received event: {event_type}\n{event}")
-        received_events.append(event)
-        last_event_time["ts"] = time.time()
-
-    # Create RemoteConversation using the workspace
-    conversation = Conversation(
-        agent=agent,
-        workspace=workspace,
-        callbacks=[event_callback],
-        visualize=True,
+    conversation = run_convo(
+        workspace,
+        agent,
+        ["Create a simple Python script that prints Hello World"],
+        close=False,  # Keep the workspace usable while the user checks VSCode
     )
-    assert isinstance(conversation, RemoteConversation)
-
-    logger.info(f"\n📋 Conversation ID: {conversation.state.id}")
-    logger.info("📝 Sending first message...")
-    conversation.send_message("Create a simple Python script that prints Hello World")
-    conversation.run()
 
     # Get VSCode URL with token
     vscode_port = (workspace.host_port or 8010) + 1
     try:
-        response = httpx.get(
+        response = LOCAL_HTTP.get(
             f"{workspace.host}/api/vscode/url",
             params={"workspace_dir": workspace.working_dir},
         )
@@ -75,8 +41,8 @@ with DockerWorkspace(
         vscode_url = vscode_data.get("url", "").replace(
             "localhost:8001", f"localhost:{vscode_port}"
         )
-    except Exception:
-        # Fallback if server route not available
+    except (httpx.HTTPError, ValueError):
+        # Fallback if server route not available or returned invalid JSON
         folder = (
             f"/{workspace.working_dir}"
             if not str(workspace.working_dir).startswith("/")
@@ -85,18 +51,20 @@ with DockerWorkspace(
         vscode_url = f"http://localhost:{vscode_port}/?folder={folder}"
 
     # Wait for user to explore VSCode
-    y = None
-    while y != "y":
-        y = input(
-            "\n"
-            "Because you've enabled extra_ports=True in DockerWorkspace, "
-            "you can open VSCode Web to see the workspace.\n\n"
-            f"VSCode URL: {vscode_url}\n\n"
-            "The VSCode should have the OpenHands settings extension installed:\n"
-            "  - Dark theme enabled\n"
-            "  - Auto-save enabled\n"
-            "  - Telemetry disabled\n"
-            "  - Auto-updates disabled\n\n"
-            "Press 'y' and Enter to exit and terminate the workspace.\n"
-            ">> "
-        )
+    prompt = (
+        "\n"
+        "Because you've enabled extra_ports=True in DockerWorkspace, "
+        "you can open VSCode Web to see the workspace.\n\n"
+        f"VSCode URL: {vscode_url}\n\n"
+        "The VSCode should have the OpenHands settings extension installed:\n"
+        "  - Dark theme enabled\n"
+        "  - Auto-save enabled\n"
+        "  - Telemetry disabled\n"
+        "  - Auto-updates disabled\n\n"
+        "Press 'y' and Enter to exit and terminate the workspace.\n"
+        ">> "
+    )
+    while True:
+        if input(prompt).strip().lower() == "y":
+            break
+    conversation.close()
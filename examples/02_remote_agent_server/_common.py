@@ -0,0 +1,276 @@
+"""Shared helpers for the remote agent server examples.
+
+Each example only sets up its own workspace; the LLM configuration, event
+callback and the conversation flow itself live here.
+"""
+
+import atexit
+import collections
+import functools
+import logging
+import os
+import platform
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import httpx
+from pydantic import SecretStr
+
+from openhands.agent_server.docker.build import PlatformType
+from openhands.sdk import (
+    LLM,
+    AgentBase,
+    Conversation,
+    Event,
+    RemoteConversation,
+    RemoteWorkspace,
+    get_logger,
+)
+from openhands.sdk.event import ConversationStateUpdateEvent
+
+
+logger = get_logger(__name__)
+
+# Keep-alive client for requests to the locally exposed agent server
+LOCAL_HTTP = httpx.Client(
+    timeout=5.0,
+    limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=30.0),
+)
+atexit.register(LOCAL_HTTP.close)
+
+DEFAULT_MESSAGES = (
+    "Read the current repo and write 3 facts about the project into FACTS.txt.",
+    "Great! Now delete that file.",
+)
+
+# Event class -> name, so each class resolves its name only once
+_cls_name_cache: dict[type, str] = {}
+
+# Set OH_COLLECT_EVENTS=1 to keep the most recent events in `received_events`
+COLLECT_EVENTS = os.environ.get("OH_COLLECT_EVENTS") == "1"
+MAX_COLLECTED_EVENTS = 10_000
+received_events: collections.deque[Event] | None = (
+    collections.deque(maxlen=MAX_COLLECTED_EVENTS) if COLLECT_EVENTS else None
+)
+state_updates: collections.deque[ConversationStateUpdateEvent] = collections.deque(
+    maxlen=MAX_COLLECTED_EVENTS
+)
+
+
+# Monotonic clock in integer nanoseconds; immune to wall-clock jumps
+NOW = time.monotonic_ns
+
+
+class QuiescenceDetector:
+    """Detects when no events have been received for a given period."""
+
+    def __init__(self) -> None:
+        self._evt = threading.Event()
+        self._last = NOW()
+        self._lock = threading.Lock()
+
+    def notify(self) -> None:
+        """Record that an event was just received."""
+        with self._lock:
+            self._last = NOW()
+        self._evt.set()
+
+    def wait_quiet(self, timeout: float) -> None:
+        """Block until no event has been received for `timeout` seconds."""
+        timeout_ns = int(timeout * 1_000_000_000)
+        while True:
+            self._evt.clear()
+            with self._lock:
+                remaining_ns = timeout_ns - (NOW() - self._last)
+            if remaining_ns <= 0:
+                return
+            self._evt.wait(remaining_ns / 1_000_000_000)
+
+
+@functools.lru_cache(maxsize=1)
+def detect_platform() -> PlatformType:
+    """Detects the correct Docker platform string."""
+    machine = platform.machine().lower()
+    if "arm" in machine or "aarch64" in machine:
+        return "linux/arm64"
+    return "linux/amd64"
+
+
+def get_required_env(name: str) -> str:
+    """Return the value of environment variable `name`, which must be set."""
+    value = os.getenv(name)
+    assert value, f"{name} environment variable is not set."
+    return value
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_llm(service_id: str, model: str, api_key: str) -> LLM:
+    # Keyed on the key value itself, so changing the env var builds a new LLM
+    return LLM(
+        service_id=service_id,
+        model=model,
+        base_url="https://llm-proxy.eval.all-hands.dev",
+        api_key=SecretStr(api_key),
+    )
+
+
+def get_llm(api_key_env: str = "LLM_API_KEY") -> LLM:
+    """Return the shared agent LLM, reading the API key from `api_key_env`."""
+    return _cached_llm(
+        "agent",
+        "litellm_proxy/anthropic/claude-sonnet-4-5-20250929",
+        get_required_env(api_key_env),
+    )
+
+
+def get_title_llm(api_key_env: str = "LLM_API_KEY") -> LLM:
+    """Return the shared LLM used to generate conversation titles."""
+    return _cached_llm(
+        "title-gen-llm",
+        "litellm_proxy/openai/gpt-5-mini",
+        get_required_env(api_key_env),
+    )
+
+
+def make_callback(
+    collect_state_updates: bool = False,
+    log_events: bool = True,
+) -> tuple[Callable[[Event], None], QuiescenceDetector]:
+    """Create an event callback and the detector it notifies.
+
+    With `log_events`, every event is logged in full at INFO. Events are only
+    kept in `received_events` when COLLECT_EVENTS is enabled, and
+    ConversationStateUpdateEvents in `state_updates` when requested.
+    """
+    detector = QuiescenceDetector()
+    _append = received_events.append if received_events is not None else None
+    _append_update = state_updates.append if collect_state_updates else None
+
+    def event_callback(event: Event) -> None:
+        if log_events and logger.isEnabledFor(logging.INFO):
+            cls = event.__class__
+            event_type = _cls_name_cache.get(cls) or _cls_name_cache.setdefault(
+                cls, cls.__name__
+            )
+            logger.info(f"🔔 Callback received event: {event_type}\n{event}")
+        if _append is not None:
+            _append(event)
+        if _append_update is not None and isinstance(
+            event, ConversationStateUpdateEvent
+        ):
+            _append_update(event)
+        detector.notify()
+
+    return event_callback, detector
+
+
+def _log_state_events(conversation: RemoteConversation) -> None:
+    """Demonstrate the state.events API of a remote conversation."""
+    logger.info("\n" + "=" * 50)
+    logger.info("📊 Demonstrating State Events API")
+    logger.info("=" * 50)
+
+    # Fetch state.events once and reuse the local list below
+    events = list(conversation.state.events)
+
+    # Count total events using state.events
+    logger.info(f"📈 Total events in conversation: {len(events)}")
+
+    # Get recent events (last 5) using state.events
+    logger.info("\n🔍 Getting last 5 events using state.events...")
+    recent_events = events[-5:]
+
+    for i, event in enumerate(recent_events, 1):
+        event_type = _cls_name_cache.setdefault(
+            event.__class__, event.__class__.__name__
+        )
+        timestamp = getattr(event, "timestamp", "Unknown")
+        logger.info(f"  {i}. {event_type} at {timestamp}")
+
+    # Let's see what the actual event types are
+    logger.info("\n🔍 Event types found:")
+    event_types = {
+        _cls_name_cache.setdefault(e.__class__, e.__class__.__name__)
+        for e in recent_events
+    }
+    for event_type in sorted(event_types):
+        logger.info(f"  - {event_type}")
+
+    # Print all ConversationStateUpdateEvent, as collected by the callback
+    logger.info("\n🗂️  ConversationStateUpdateEvent events:")
+    for event in state_updates:
+        logger.info(f"  - {event}")
+
+
+def run_convo(
+    workspace: RemoteWorkspace,
+    agent: AgentBase,
+    messages: Sequence[str] = DEFAULT_MESSAGES,
+    *,
+    generate_title: bool = False,
+    show_state_events: bool = False,
+    log_events: bool = True,
+    close: bool = True,
+) -> RemoteConversation:
+    """Send `messages` one at a time, running the conversation after each.
+
+    Between turns, waits until no events have arrived for 2 seconds. With
+    `generate_title`, the title is generated in the background while the first
+    turn runs; the server only reads the first user message for it.
+
+    The conversation is closed afterwards unless `close` is False. Closing it
+    also closes the workspace's HTTP client, so pass False when the workspace
+    is used again after the conversation, and close the returned conversation
+    once done.
+    """
+    event_callback, detector = make_callback(
+        collect_state_updates=show_state_events, log_events=log_events
+    )
+    conversation = Conversation(
+        agent=agent,
+        workspace=workspace,
+        callbacks=[event_callback],
+        visualize=True,
+    )
+    assert isinstance(conversation, RemoteConversation)
+
+    title_executor = ThreadPoolExecutor(max_workers=1) if generate_title else None
+    try:
+        logger.info(f"\n📋 Conversation ID: {conversation.state.id}")
+
+        for i, message in enumerate(messages, 1):
+            if i > 1:
+                # Wait for events to stop coming (no events for 2 seconds)
+                logger.info("⏳ Waiting for events to stop...")
+                detector.wait_quiet(2.0)
+                logger.info("✅ Events have stopped")
+
+            logger.info(f"📝 Sending message {i}/{len(messages)}...")
+            conversation.send_message(message)
+
+            title_future: Future[str] | None = None
+            if i == 1 and title_executor is not None:
+                # Generate title using a specific LLM, overlapped with the run
+                title_future = title_executor.submit(
+                    conversation.generate_title, max_length=60, llm=get_title_llm()
+                )
+
+            logger.info("🚀 Running conversation...")
+            conversation.run()
+            if title_future is not None:
+                logger.info(f"Generated conversation title: {title_future.result()}")
+            logger.info(f"✅ Task {i} completed!")
+            logger.info(f"Agent status: {conversation.state.agent_status}")
+
+        if show_state_events:
+            _log_state_events(conversation)
+    finally:
+        if title_executor is not None:
+            title_executor.shutdown(wait=False, cancel_futures=True)
+        if close:
+            # Clean up
+            logger.info("\n🧹 Cleaning up conversation...")
+            conversation.close()
+    return conversation